@@ -6,22 +6,37 @@ we build the layers manually using real Singapore geography.
 """
 
 import json
-import os
 import math
-import random
+import sys
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from itertools import compress
 
 OUTPUT_DIR = "/home/claude/breatheasy-data/osm"
 
+# Decimal places kept for generated coordinates (~0.1 m). Waypoints have
+# three decimals, so interpolating at densities 8 and 10 needs at most six;
+# rounding only strips float noise such as 1.3330000000000002.
+COORD_PRECISION = 6
+
 def save_geojson(filename, features):
-    """Save features as a GeoJSON FeatureCollection."""
-    fc = {
-        "type": "FeatureCollection",
-        "features": features
-    }
-    path = os.path.join(OUTPUT_DIR, filename)
+    """Save features as a GeoJSON FeatureCollection.
+
+    Features can be any iterable. Each one is encoded and written as it
+    arrives, so only a single feature is held in memory at a time.
+    Returns a status line for the build log.
+    """
+    path = f"{OUTPUT_DIR}/{filename}"
+    count = 0
     with open(path, "w") as f:
-        json.dump(fc, f)
-    print(f"  Saved {path}: {len(features)} features")
+        f.write('{"type": "FeatureCollection", "features": [')
+        for count, feature in enumerate(features, 1):
+            if count > 1:
+                f.write(", ")
+            f.write(json.dumps(feature))
+        f.write("]}")
+    return f"  Saved {path}: {count} features"
 
 def line_feature(coords, props=None):
     """Create a GeoJSON LineString feature. Coords are (lng, lat) pairs."""
@@ -45,53 +60,92 @@ def point_feature(lng, lat, props=None):
     }
 
 def polygon_feature(coords, props=None):
-    """Coords are (lng, lat) pairs forming a closed ring."""
-    if coords[0] != coords[-1]:
-        coords = coords + [coords[0]]
+    """Coords are (lng, lat) pairs forming a ring, closed here if needed.
+
+    Any sequence of pairs is accepted (lists or tuples); vertices are
+    rounded to COORD_PRECISION.
+    """
+    ring = [
+        [round(lng, COORD_PRECISION), round(lat, COORD_PRECISION)]
+        for lng, lat in coords
+    ]
+    if ring[0] != ring[-1]:
+        ring.append(ring[0])
     return {
         "type": "Feature",
         "geometry": {
             "type": "Polygon",
-            "coordinates": [coords]
+            "coordinates": [ring]
         },
         "properties": props or {}
     }
 
+class LineLayer:
+    """LineString features for one layer, stored as flat coordinate arrays.
+
+    Longitudes and latitudes live in two parallel C double arrays, with
+    offsets marking where each line starts. Feature dicts are only built
+    when the layer is serialized.
+    """
+
+    def __init__(self):
+        self.lngs = array("d")
+        self.lats = array("d")
+        self.offsets = [0]
+        self.props = []
+
+    def add(self, coords, props=None):
+        self.lngs.extend(lng for lng, _ in coords)
+        self.lats.extend(lat for _, lat in coords)
+        self.offsets.append(len(self.lngs))
+        self.props.append(props)
+
+    def features(self):
+        """Yield each line as a GeoJSON feature."""
+        for start, end, props in zip(self.offsets, self.offsets[1:], self.props):
+            coords = list(map(list, zip(self.lngs[start:end], self.lats[start:end])))
+            yield line_feature(coords, props)
+
+@lru_cache(maxsize=8)
+def _interpolation_steps(density):
+    """Fractions 0, 1/density, ... along a segment; shared by every call."""
+    return tuple(j / density for j in range(density))
+
 def interpolate_line(points, density=20):
     """Interpolate between waypoints to create a denser line."""
-    result = []
-    for i in range(len(points) - 1):
-        lng1, lat1 = points[i]
-        lng2, lat2 = points[i + 1]
-        for j in range(density):
-            t = j / density
-            result.append([
-                lng1 + t * (lng2 - lng1),
-                lat1 + t * (lat2 - lat1)
-            ])
+    steps = _interpolation_steps(density)
+    result = [
+        [
+            round(lng1 + t * (lng2 - lng1), COORD_PRECISION),
+            round(lat1 + t * (lat2 - lat1), COORD_PRECISION),
+        ]
+        for (lng1, lat1), (lng2, lat2) in zip(points, points[1:])
+        for t in steps
+    ]
     result.append(points[-1])
     return result
 
 def buffer_line_to_polygon(coords, width_deg=0.001):
     """Create a simple polygon buffer around a line (for parks/zones)."""
-    left = []
-    right = []
-    for i in range(len(coords)):
-        lng, lat = coords[i]
-        if i < len(coords) - 1:
-            dlng = coords[i+1][0] - lng
-            dlat = coords[i+1][1] - lat
-        else:
-            dlng = lng - coords[i-1][0]
-            dlat = lat - coords[i-1][1]
-        length = math.sqrt(dlng**2 + dlat**2)
-        if length == 0:
-            continue
-        nx = -dlat / length * width_deg
-        ny = dlng / length * width_deg
-        left.append([lng + nx, lat + ny])
-        right.append([lng - nx, lat - ny])
-    right.reverse()
+    # Direction at each vertex: towards the next one, or from the previous
+    # one for the final vertex.
+    deltas = [
+        (lng2 - lng1, lat2 - lat1)
+        for (lng1, lat1), (lng2, lat2) in zip(coords, coords[1:])
+    ]
+    deltas.append(deltas[-1])
+    lengths = [math.hypot(dlng, dlat) for dlng, dlat in deltas]
+    # Repeated vertices have no direction; drop them with a single mask
+    # rather than a per-vertex branch.
+    keep = [length != 0 for length in lengths]
+    normals = [
+        (lng, lat, -dlat / length * width_deg, dlng / length * width_deg)
+        for (lng, lat), (dlng, dlat), length in zip(
+            compress(coords, keep), compress(deltas, keep), compress(lengths, keep)
+        )
+    ]
+    left = [[lng + nx, lat + ny] for lng, lat, nx, ny in normals]
+    right = [[lng - nx, lat - ny] for lng, lat, nx, ny in reversed(normals)]
     ring = left + right + [left[0]]
     return ring
 
@@ -99,8 +153,6 @@ def buffer_line_to_polygon(coords, width_deg=0.001):
 # ============================================================
 # 1. EXPRESSWAYS
 # ============================================================
-print("Generating expressways...")
-
 # PIE (Pan-Island Expressway) — runs east-west across central Singapore
 PIE = interpolate_line([
     [103.637, 1.332], [103.660, 1.342], [103.680, 1.352],
@@ -170,25 +222,28 @@ MCE = interpolate_line([
     [103.858, 1.278], [103.862, 1.285], [103.858, 1.290],
 ], density=10)
 
-expressway_features = []
-for name, coords in [
-    ("PIE", PIE), ("AYE", AYE), ("CTE", CTE), ("ECP", ECP),
-    ("BKE", BKE), ("SLE", SLE), ("TPE", TPE), ("KPE", KPE), ("MCE", MCE)
-]:
-    expressway_features.append(line_feature(coords, {
-        "name": name,
-        "highway": "motorway",
-        "ref": name,
-        "lanes": "3" if name in ("MCE", "KPE") else "4",
-    }))
-
-save_geojson("expressways.geojson", expressway_features)
+# Lane counts that differ from the 4-lane default
+EXPRESSWAY_LANES = {"MCE": "3", "KPE": "3"}
+
+def build_expressways():
+    log = ["Generating expressways..."]
+    expressways = LineLayer()
+    for name, coords in [
+        ("PIE", PIE), ("AYE", AYE), ("CTE", CTE), ("ECP", ECP),
+        ("BKE", BKE), ("SLE", SLE), ("TPE", TPE), ("KPE", KPE), ("MCE", MCE)
+    ]:
+        expressways.add(coords, {
+            "name": name,
+            "highway": "motorway",
+            "ref": name,
+            "lanes": EXPRESSWAY_LANES.get(name, "4"),
+        })
+    log.append(save_geojson("expressways.geojson", expressways.features()))
+    return log
 
 # ============================================================
 # 2. ARTERIAL ROADS (major roads / primary + secondary)
 # ============================================================
-print("Generating arterials...")
-
 arterials_data = [
     ("Orchard Road", [[103.826, 1.300], [103.832, 1.302], [103.838, 1.304], [103.844, 1.304]]),
     ("Bukit Timah Road", [[103.840, 1.305], [103.835, 1.315], [103.830, 1.325], [103.822, 1.340], [103.815, 1.350], [103.805, 1.362]]),
@@ -222,21 +277,21 @@ arterials_data = [
     ("Mandai Road", [[103.780, 1.395], [103.785, 1.400], [103.790, 1.408]]),
 ]
 
-arterial_features = []
-for name, waypoints in arterials_data:
-    coords = interpolate_line([[p[0], p[1]] for p in waypoints], density=8)
-    arterial_features.append(line_feature(coords, {
-        "name": name,
-        "highway": "primary",
-    }))
-
-save_geojson("arterials.geojson", arterial_features)
+def build_arterials():
+    log = ["Generating arterials..."]
+    arterials = LineLayer()
+    for name, waypoints in arterials_data:
+        coords = interpolate_line([[p[0], p[1]] for p in waypoints], density=8)
+        arterials.add(coords, {
+            "name": name,
+            "highway": "primary",
+        })
+    log.append(save_geojson("arterials.geojson", arterials.features()))
+    return log
 
 # ============================================================
 # 3. TRAFFIC SIGNALS (major junctions)
 # ============================================================
-print("Generating traffic signals...")
-
 # Major junction locations
 junctions = [
     (103.845, 1.304, "Orchard/Scotts"),
@@ -270,26 +325,27 @@ junctions = [
     (103.905, 1.322, "Sims/Changi"),
 ]
 
-# Add more junctions along major roads (every ~500m along expressways)
-extra_junctions = []
-for name, coords in [("PIE", PIE), ("AYE", AYE), ("CTE", CTE)]:
-    for i in range(0, len(coords), 15):
-        extra_junctions.append((coords[i][0], coords[i][1], f"{name} Junction"))
-
-signal_features = []
-for lng, lat, name in junctions + extra_junctions:
-    signal_features.append(point_feature(lng, lat, {
-        "highway": "traffic_signals",
-        "name": name,
-    }))
-
-save_geojson("traffic_signals.geojson", signal_features)
+def build_traffic_signals():
+    log = ["Generating traffic signals..."]
+    # Add more junctions along major roads (every ~500m along expressways)
+    extra_junctions = [
+        (lng, lat, f"{name} Junction")
+        for name, coords in [("PIE", PIE), ("AYE", AYE), ("CTE", CTE)]
+        for lng, lat in coords[::15]
+    ]
+    signal_features = (
+        point_feature(lng, lat, {
+            "highway": "traffic_signals",
+            "name": name,
+        })
+        for lng, lat, name in junctions + extra_junctions
+    )
+    log.append(save_geojson("traffic_signals.geojson", signal_features))
+    return log
 
 # ============================================================
 # 4. PARKS AND GREEN SPACES
 # ============================================================
-print("Generating parks...")
-
 parks_data = [
     ("East Coast Park", [
         [103.870, 1.298], [103.880, 1.296], [103.900, 1.296],
@@ -370,20 +426,21 @@ parks_data = [
     ]),
 ]
 
-park_features = []
-for name, ring in parks_data:
-    park_features.append(polygon_feature(ring, {
-        "name": name,
-        "leisure": "park",
-    }))
-
-save_geojson("parks.geojson", park_features)
+def build_parks():
+    log = ["Generating parks..."]
+    park_features = (
+        polygon_feature(ring, {
+            "name": name,
+            "leisure": "park",
+        })
+        for name, ring in parks_data
+    )
+    log.append(save_geojson("parks.geojson", park_features))
+    return log
 
 # ============================================================
 # 5. INDUSTRIAL ZONES
 # ============================================================
-print("Generating industrial zones...")
-
 industrial_data = [
     ("Jurong Industrial Estate", [
         [103.690, 1.310], [103.720, 1.308], [103.725, 1.320],
@@ -419,23 +476,23 @@ industrial_data = [
     ]),
 ]
 
-industrial_features = []
-for name, ring in industrial_data:
-    industrial_features.append(polygon_feature(ring, {
-        "name": name,
-        "landuse": "industrial",
-    }))
-
-save_geojson("industrial.geojson", industrial_features)
+def build_industrial():
+    log = ["Generating industrial zones..."]
+    industrial_features = (
+        polygon_feature(ring, {
+            "name": name,
+            "landuse": "industrial",
+        })
+        for name, ring in industrial_data
+    )
+    log.append(save_geojson("industrial.geojson", industrial_features))
+    return log
 
 # ============================================================
 # 6. BUILDINGS (simplified — dense clusters near major roads)
 # ============================================================
-print("Generating buildings (simplified clusters)...")
-
 # We don't need individual buildings — just dense zones near roads
 # for the street canyon calculation. Generate rectangles along arterials.
-building_features = []
 
 # CBD area — dense buildings
 cbd_centers = [
@@ -472,24 +529,21 @@ hdb_centers = [
     (103.798, 1.294), (103.800, 1.296), (103.796, 1.298),
 ]
 
-for lng, lat in cbd_centers + hdb_centers:
-    # Create small building footprint (~30m x 30m)
+def build_buildings():
+    log = ["Generating buildings (simplified clusters)..."]
+    # Small building footprint (~30m x 30m): corner offsets from each center
     size = 0.0003
-    ring = [
-        [lng - size, lat - size],
-        [lng + size, lat - size],
-        [lng + size, lat + size],
-        [lng - size, lat + size],
-    ]
-    building_features.append(polygon_feature(ring, {"building": "yes"}))
-
-save_geojson("buildings.geojson", building_features)
+    corners = [(-size, -size), (size, -size), (size, size), (-size, size)]
+    building_features = (
+        polygon_feature([[lng + dlng, lat + dlat] for dlng, dlat in corners], {"building": "yes"})
+        for lng, lat in cbd_centers + hdb_centers
+    )
+    log.append(save_geojson("buildings.geojson", building_features))
+    return log
 
 # ============================================================
 # 7. CYCLEWAYS / PARK CONNECTORS
 # ============================================================
-print("Generating cycleways...")
-
 pcn_data = [
     ("Eastern Coastal PCN", [
         [103.870, 1.300], [103.890, 1.302], [103.910, 1.304],
@@ -513,15 +567,33 @@ pcn_data = [
     ]),
 ]
 
-cycleway_features = []
-for name, waypoints in pcn_data:
-    coords = interpolate_line(waypoints, density=8)
-    cycleway_features.append(line_feature(coords, {
-        "name": name,
-        "highway": "cycleway",
-    }))
-
-save_geojson("cycleways.geojson", cycleway_features)
+def build_cycleways():
+    log = ["Generating cycleways..."]
+    cycleways = LineLayer()
+    for name, waypoints in pcn_data:
+        coords = interpolate_line(waypoints, density=8)
+        cycleways.add(coords, {
+            "name": name,
+            "highway": "cycleway",
+        })
+    log.append(save_geojson("cycleways.geojson", cycleways.features()))
+    return log
+
+
+BUILDERS = [
+    build_expressways, build_arterials, build_traffic_signals, build_parks,
+    build_industrial, build_buildings, build_cycleways,
+]
 
-print("\n✅ All GeoJSON files generated!")
-print(f"   Output directory: {OUTPUT_DIR}")
+if __name__ == "__main__":
+    # Each layer writes its own file and shares only read-only data,
+    # so the layers are built in parallel worker processes. Builders
+    # return their log lines, which are written once in layer order.
+    log = []
+    with ProcessPoolExecutor() as executor:
+        for future in [executor.submit(build) for build in BUILDERS]:
+            log.extend(future.result())
+
+    log.append("\n✅ All GeoJSON files generated!")
+    log.append(f"   Output directory: {OUTPUT_DIR}")
+    sys.stdout.write("\n".join(log) + "\n")